@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\njobs.proto\x12\tmapreduce\"J\n\x15RegisterEngineRequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\x12\x0c\n\x04role\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61pacity\x18\x03 \x01(\x05\"7\n\x13RegisterEngineReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"$\n\x0f\x46\x65tchJobRequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\"A\n\x07MapTask\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x10\n\x08shard_id\x18\x02 \x01(\x05\x12\x14\n\x0ctext_content\x18\x03 \x01(\t\":\n\nReduceTask\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x0c\n\x04word\x18\x02 \x01(\t\x12\x0e\n\x06\x63ounts\x18\x03 \x03(\x05\"t\n\rFetchJobReply\x12\x11\n\ttask_type\x18\x01 \x01(\t\x12$\n\x08map_task\x18\x02 \x01(\x0b\x32\x12.mapreduce.MapTask\x12*\n\x0breduce_task\x18\x03 \x01(\x0b\x32\x15.mapreduce.ReduceTask\"(\n\tMapOutput\x12\x0c\n\x04word\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\"\xab\x01\n\x13ReportResultRequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\x11\n\ttask_type\x18\x03 \x01(\t\x12\x10\n\x08shard_id\x18\x04 \x01(\x05\x12)\n\x0bmap_outputs\x18\x05 \x03(\x0b\x32\x14.mapreduce.MapOutput\x12\x0c\n\x04word\x18\x06 \x01(\t\x12\x13\n\x0btotal_count\x18\x07 \x01(\x05\"5\n\x11ReportResultReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xf0\x01\n\nJobService\x12R\n\x0eRegisterEngine\x12 .mapreduce.RegisterEngineRequest\x1a\x1e.mapreduce.RegisterEngineReply\x12@\n\x08\x46\x65tchJob\x12\x1a.mapreduce.FetchJobRequest\x1a\x18.mapreduce.FetchJobReply\x12L\n\x0cReportResult\x12\x1e.mapreduce.ReportResultRequest\x1a\x1c.mapreduce.ReportResultReplyb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\njobs.proto\x12\tmapreduce\"b\n\x15RegisterEngineRequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\x12\x0c\n\x04role\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61pacity\x18\x03 \x01(\x05\x12\x16\n\x0eshared_storage\x18\x04 \x01(\x08\"7\n\x13RegisterEngineReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"$\n\x0f\x46\x65tchJobRequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\"\x8d\x01\n\x07MapTask\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x10\n\x08shard_id\x18\x02 \x01(\x05\x12\x14\n\x0ctext_content\x18\x03 \x01(\t\x12\x16\n\x0enum_partitions\x18\x04 \x01(\x05\x12\x12\n\ninput_path\x18\x05 \x01(\t\x12\x0e\n\x06offset\x18\x06 \x01(\x03\x12\x0e\n\x06length\x18\x07 \x01(\x03\"\x81\x01\n\nReduceTask\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x14\n\x0cpartition_id\x18\x04 \x01(\x05\x12\'\n\x06inputs\x18\x06 \x03(\x0b\x32\x17.mapreduce.MapPartitionJ\x04\x08\x02\x10\x03J\x04\x08\x03\x10\x04J\x04\x08\x05\x10\x06R\x04wordR\x06\x63ountsR\x04keys\"t\n\rFetchJobReply\x12\x11\n\ttask_type\x18\x01 \x01(\t\x12$\n\x08map_task\x18\x02 \x01(\x0b\x32\x12.mapreduce.MapTask\x12*\n\x0breduce_task\x18\x03 \x01(\x0b\x32\x15.mapreduce.ReduceTask\"(\n\tMapOutput\x12\x0c\n\x04word\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\"K\n\x0cMapPartition\x12\x14\n\x0cpartition_id\x18\x01 \x01(\x05\x12%\n\x07outputs\x18\x02 \x03(\x0b\x32\x14.mapreduce.MapOutput\"\x84\x02\n\x13ReportResultRequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\x12\x0e\n\x06job_id\x18\x02 \x01(\t\x12\x11\n\ttask_type\x18\x03 \x01(\t\x12\x10\n\x08shard_id\x18\x04 \x01(\x05\x12/\n\x0emap_partitions\x18\n \x03(\x0b\x32\x17.mapreduce.MapPartition\x12\x14\n\x0cpartition_id\x18\x08 \x01(\x05\x12,\n\x0ereduce_outputs\x18\t \x03(\x0b\x32\x14.mapreduce.MapOutputJ\x04\x08\x05\x10\x06J\x04\x08\x06\x10\x07J\x04\x08\x07\x10\x08R\x0bmap_outputsR\x04wordR\x0btotal_count\"5\n\x11ReportResultReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"g\n\x11TaskStreamRequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\x12\x0f\n\x07\x63redits\x18\x02 \x01(\x05\x12.\n\x06result\x18\x03 \x01(\x0b\x32\x1e.mapreduce.ReportResultRequest\"%\n\x10HeartbeatRequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\"\x1f\n\x0eHeartbeatReply\x12\r\n\x05known\x18\x01 \x01(\x08\x32\x80\x03\n\nJobService\x12R\n\x0eRegisterEngine\x12 .mapreduce.RegisterEngineRequest\x1a\x1e.mapreduce.RegisterEngineReply\x12@\n\x08\x46\x65tchJob\x12\x1a.mapreduce.FetchJobRequest\x1a\x18.mapreduce.FetchJobReply\x12L\n\x0cReportResult\x12\x1e.mapreduce.ReportResultRequest\x1a\x1c.mapreduce.ReportResultReply\x12I\n\x0bStreamTasks\x12\x1c.mapreduce.TaskStreamRequest\x1a\x18.mapreduce.FetchJobReply(\x01\x30\x01\x12\x43\n\tHeartbeat\x12\x1b.mapreduce.HeartbeatRequest\x1a\x19.mapreduce.HeartbeatReplyb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,23 +32,31 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'jobs_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_REGISTERENGINEREQUEST']._serialized_start=25
-  _globals['_REGISTERENGINEREQUEST']._serialized_end=99
-  _globals['_REGISTERENGINEREPLY']._serialized_start=101
-  _globals['_REGISTERENGINEREPLY']._serialized_end=156
-  _globals['_FETCHJOBREQUEST']._serialized_start=158
-  _globals['_FETCHJOBREQUEST']._serialized_end=194
-  _globals['_MAPTASK']._serialized_start=196
-  _globals['_MAPTASK']._serialized_end=261
-  _globals['_REDUCETASK']._serialized_start=263
-  _globals['_REDUCETASK']._serialized_end=321
-  _globals['_FETCHJOBREPLY']._serialized_start=323
-  _globals['_FETCHJOBREPLY']._serialized_end=439
-  _globals['_MAPOUTPUT']._serialized_start=441
-  _globals['_MAPOUTPUT']._serialized_end=481
-  _globals['_REPORTRESULTREQUEST']._serialized_start=484
-  _globals['_REPORTRESULTREQUEST']._serialized_end=655
-  _globals['_REPORTRESULTREPLY']._serialized_start=657
-  _globals['_REPORTRESULTREPLY']._serialized_end=710
-  _globals['_JOBSERVICE']._serialized_start=713
-  _globals['_JOBSERVICE']._serialized_end=953
+  _globals['_REGISTERENGINEREQUEST']._serialized_end=123
+  _globals['_REGISTERENGINEREPLY']._serialized_start=125
+  _globals['_REGISTERENGINEREPLY']._serialized_end=180
+  _globals['_FETCHJOBREQUEST']._serialized_start=182
+  _globals['_FETCHJOBREQUEST']._serialized_end=218
+  _globals['_MAPTASK']._serialized_start=221
+  _globals['_MAPTASK']._serialized_end=362
+  _globals['_REDUCETASK']._serialized_start=365
+  _globals['_REDUCETASK']._serialized_end=494
+  _globals['_FETCHJOBREPLY']._serialized_start=496
+  _globals['_FETCHJOBREPLY']._serialized_end=612
+  _globals['_MAPOUTPUT']._serialized_start=614
+  _globals['_MAPOUTPUT']._serialized_end=654
+  _globals['_MAPPARTITION']._serialized_start=656
+  _globals['_MAPPARTITION']._serialized_end=731
+  _globals['_REPORTRESULTREQUEST']._serialized_start=734
+  _globals['_REPORTRESULTREQUEST']._serialized_end=994
+  _globals['_REPORTRESULTREPLY']._serialized_start=996
+  _globals['_REPORTRESULTREPLY']._serialized_end=1049
+  _globals['_TASKSTREAMREQUEST']._serialized_start=1051
+  _globals['_TASKSTREAMREQUEST']._serialized_end=1154
+  _globals['_HEARTBEATREQUEST']._serialized_start=1156
+  _globals['_HEARTBEATREQUEST']._serialized_end=1193
+  _globals['_HEARTBEATREPLY']._serialized_start=1195
+  _globals['_HEARTBEATREPLY']._serialized_end=1226
+  _globals['_JOBSERVICE']._serialized_start=1229
+  _globals['_JOBSERVICE']._serialized_end=1613
 # @@protoc_insertion_point(module_scope)
@@ -49,6 +49,16 @@ class JobServiceStub(object):
                 request_serializer=jobs__pb2.ReportResultRequest.SerializeToString,
                 response_deserializer=jobs__pb2.ReportResultReply.FromString,
                 _registered_method=True)
+        self.StreamTasks = channel.stream_stream(
+                '/mapreduce.JobService/StreamTasks',
+                request_serializer=jobs__pb2.TaskStreamRequest.SerializeToString,
+                response_deserializer=jobs__pb2.FetchJobReply.FromString,
+                _registered_method=True)
+        self.Heartbeat = channel.unary_unary(
+                '/mapreduce.JobService/Heartbeat',
+                request_serializer=jobs__pb2.HeartbeatRequest.SerializeToString,
+                response_deserializer=jobs__pb2.HeartbeatReply.FromString,
+                _registered_method=True)
 
 
 class JobServiceServicer(object):
@@ -72,6 +82,18 @@ class JobServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamTasks(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Heartbeat(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_JobServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -90,6 +112,16 @@ def add_JobServiceServicer_to_server(servicer, server):
                     request_deserializer=jobs__pb2.ReportResultRequest.FromString,
                     response_serializer=jobs__pb2.ReportResultReply.SerializeToString,
             ),
+            'StreamTasks': grpc.stream_stream_rpc_method_handler(
+                    servicer.StreamTasks,
+                    request_deserializer=jobs__pb2.TaskStreamRequest.FromString,
+                    response_serializer=jobs__pb2.FetchJobReply.SerializeToString,
+            ),
+            'Heartbeat': grpc.unary_unary_rpc_method_handler(
+                    servicer.Heartbeat,
+                    request_deserializer=jobs__pb2.HeartbeatRequest.FromString,
+                    response_serializer=jobs__pb2.HeartbeatReply.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'mapreduce.JobService', rpc_method_handlers)
@@ -181,3 +213,57 @@ class JobService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def StreamTasks(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/mapreduce.JobService/StreamTasks',
+            jobs__pb2.TaskStreamRequest.SerializeToString,
+            jobs__pb2.FetchJobReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Heartbeat(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/mapreduce.JobService/Heartbeat',
+            jobs__pb2.HeartbeatRequest.SerializeToString,
+            jobs__pb2.HeartbeatReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
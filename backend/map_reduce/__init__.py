@@ -1 +1 @@
-__all__ = ["api", "models", "db", "coordinator", "grpc_service", "grpc_server", "utils"]
+__all__ = ["api", "models", "db", "coordinator", "grpc_service", "grpc_server", "ingest", "leases", "partitioning", "scheduler", "sharding", "combiners", "utils"]
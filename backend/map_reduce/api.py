@@ -1,14 +1,22 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, UploadFile, File
 from contextlib import asynccontextmanager
-from .models import JobCreate, JobResponse, EngineInfo, LogEntry
+from .models import JobCreate, JobOptions, JobResponse, EngineInfo, LogEntry
 from .db import get_mongo_client, close_client
 from .coordinator import coordinator
+from .ingest import (
+    SpooledInput,
+    compute_shard_ranges,
+    discard,
+    spool_text,
+    spool_upload,
+)
+from .partitioning import DEFAULT_NUM_PARTITIONS
+from .scheduler import DEFAULT_STRATEGY, SCHEDULERS
+from .sharding import plan_shards
 from typing import List
 from .utils import get_logger, env
-from collections import defaultdict
 import uuid
 import time
-import re
 from datetime import datetime, timezone
 
 logger = get_logger(__name__)
@@ -30,38 +38,63 @@ def create_app() -> FastAPI:
     app = FastAPI(lifespan=lifespan)
     api_router = APIRouter(prefix="/api")
 
-    @api_router.post("/jobs", response_model=JobResponse)
-    async def create_job(job_data: JobCreate):
+    def validate_options(options: JobOptions):
+        strategy = options.balancing_strategy
+        if strategy and strategy not in SCHEDULERS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Estrategia desconocida: {strategy}. "
+                f"Disponibles: {', '.join(SCHEDULERS)}",
+            )
+
+    async def submit_job(spooled: SpooledInput, options: JobOptions) -> JobResponse:
         try:
             job_id = str(uuid.uuid4())
-            text = job_data.text
-            words = re.findall(r"\b\w+\b", text.lower())
-            shard_size = max(100, len(words) // 4)
-            shards = []
-            for i in range(0, len(words), shard_size):
-                shards.append(" ".join(words[i : i + shard_size]))
+            plan = plan_shards(
+                spooled.size,
+                coordinator.engines_snapshot().values(),
+                coordinator.map_throughput.estimate,
+            )
+            # Shards are byte ranges of the spooled file, read when dispatched
+            shards = compute_shard_ranges(spooled.path, spooled.size, plan.num_shards)
             num_shards = len(shards)
+            num_partitions = options.num_reduce_partitions or DEFAULT_NUM_PARTITIONS
 
             job = {
                 "job_id": job_id,
-                "text": text,
+                "input_path": spooled.path,
+                "input_bytes": spooled.size,
+                "text_length": spooled.text_length,
                 "status": "map",
+                "balancing_strategy": options.balancing_strategy or DEFAULT_STRATEGY,
                 "num_shards": num_shards,
+                "shards": shards,
+                "shard_plan": plan,
                 "completed_shards": 0,
-                "map_results": defaultdict(list),
+                "done_shards": set(),
+                "num_partitions": num_partitions,
+                "map_partitions": [[] for _ in range(num_partitions)],
                 "reduce_results": {},
                 "num_reduce_tasks": 0,
                 "completed_reduce_tasks": 0,
+                "done_partitions": set(),
+                "task_seconds": {"map": [], "reduce": []},
                 "top_words": None,
                 "created_at": datetime.now(timezone.utc).isoformat(),
                 "completed_at": None,
             }
-            coordinator.jobs[job_id] = job
-            coordinator.balancing_strategy = (
-                job_data.balancing_strategy or "round_robin"
+            coordinator.add_job(job)
+            priority = options.priority or 0
+            coordinator.map_queue.set_priority(job_id, priority)
+            coordinator.reduce_queue.set_priority(job_id, priority)
+            coordinator.map_queue.extend(
+                job_id,
+                (
+                    (job_id, idx, offset, length)
+                    for idx, (offset, length) in enumerate(shards)
+                ),
             )
-            for idx, shard in enumerate(shards):
-                coordinator.map_queue.append((job_id, idx, shard))
+            coordinator.notify_tasks()
 
             # Save summary to MongoDB (non-blocking)
             client = get_mongo_client()
@@ -69,8 +102,9 @@ def create_app() -> FastAPI:
             await db.jobs.insert_one(
                 {
                     "job_id": job_id,
-                    "text_length": len(text),
+                    "text_length": spooled.text_length,
                     "num_shards": num_shards,
+                    "num_reduce_partitions": num_partitions,
                     "status": "map",
                     "created_at": job["created_at"],
                 }
@@ -80,26 +114,41 @@ def create_app() -> FastAPI:
             return JobResponse(
                 job_id=job_id,
                 status="map",
-                text_length=len(text),
+                text_length=spooled.text_length,
                 num_shards=num_shards,
+                num_reduce_partitions=num_partitions,
+                shard_plan=plan,
                 created_at=job["created_at"],
             )
         except Exception as exc:
             logger.exception("Error creando job: %s", exc)
+            discard(spooled.path)
             raise HTTPException(
                 status_code=500, detail="Internal server error while creating job"
             )
 
-    @api_router.post("/jobs/upload")
-    async def upload_job(file: UploadFile = File(...)):
-        content = await file.read()
-        text = content.decode("utf-8")
-        return await create_job(JobCreate(text=text))
+    @api_router.post("/jobs", response_model=JobResponse)
+    async def create_job(job_data: JobCreate):
+        validate_options(job_data)
+        spooled = spool_text(job_data.text)
+        return await submit_job(spooled, job_data)
+
+    @api_router.post("/jobs/upload", response_model=JobResponse)
+    async def upload_job(
+        file: UploadFile = File(...), options: JobOptions = Depends()
+    ):
+        validate_options(options)
+        try:
+            spooled = await spool_upload(file)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="El archivo no es UTF-8 válido")
+        return await submit_job(spooled, options)
 
     @api_router.get("/jobs", response_model=List[JobResponse])
     async def list_jobs():
         jobs_list = []
-        for job_id, job in coordinator.jobs.items():
+        for job in coordinator.jobs_snapshot():
+            job_id = job["job_id"]
             duration = None
             if job["completed_at"]:
                 start = datetime.fromisoformat(job["created_at"])
@@ -109,8 +158,10 @@ def create_app() -> FastAPI:
                 JobResponse(
                     job_id=job_id,
                     status=job["status"],
-                    text_length=len(job["text"]),
+                    text_length=job["text_length"],
                     num_shards=job["num_shards"],
+                    num_reduce_partitions=job["num_partitions"],
+                    shard_plan=job["shard_plan"],
                     top_words=job["top_words"],
                     created_at=job["created_at"],
                     completed_at=job["completed_at"],
@@ -121,9 +172,9 @@ def create_app() -> FastAPI:
 
     @api_router.get("/jobs/{job_id}", response_model=JobResponse)
     async def get_job(job_id: str):
-        if job_id not in coordinator.jobs:
+        job = coordinator.get_job(job_id)
+        if job is None:
             raise HTTPException(status_code=404, detail="Trabajo no encontrado")
-        job = coordinator.jobs[job_id]
         duration = None
         if job["completed_at"]:
             start = datetime.fromisoformat(job["created_at"])
@@ -132,8 +183,10 @@ def create_app() -> FastAPI:
         return JobResponse(
             job_id=job_id,
             status=job["status"],
-            text_length=len(job["text"]),
+            text_length=job["text_length"],
             num_shards=job["num_shards"],
+            num_reduce_partitions=job["num_partitions"],
+            shard_plan=job["shard_plan"],
             top_words=job["top_words"],
             created_at=job["created_at"],
             completed_at=job["completed_at"],
@@ -144,7 +197,7 @@ def create_app() -> FastAPI:
     async def list_engines():
         engines_list = []
         current_time = time.time()
-        for engine_id, engine in coordinator.engines.items():
+        for engine_id, engine in coordinator.engines_snapshot().items():
             time_since_seen = current_time - engine["last_seen"]
             status = "active" if time_since_seen < 10 else "idle"
             engines_list.append(
@@ -153,6 +206,7 @@ def create_app() -> FastAPI:
                     role=engine["role"],
                     capacity=engine["capacity"],
                     current_load=engine["current_load"],
+                    avg_task_seconds=engine["avg_task_seconds"],
                     last_seen=datetime.fromtimestamp(
                         engine["last_seen"], tz=timezone.utc
                     ).isoformat(),
@@ -167,20 +221,16 @@ def create_app() -> FastAPI:
 
     @api_router.get("/stats")
     async def get_stats():
+        engines = coordinator.engines_snapshot().values()
+        jobs = coordinator.jobs_snapshot()
         return {
-            "total_engines": len(coordinator.engines),
-            "mappers": len(
-                [e for e in coordinator.engines.values() if e["role"] == "mapper"]
-            ),
-            "reducers": len(
-                [e for e in coordinator.engines.values() if e["role"] == "reducer"]
-            ),
+            "total_engines": len(engines),
+            "mappers": len([e for e in engines if e["role"] == "mapper"]),
+            "reducers": len([e for e in engines if e["role"] == "reducer"]),
             "map_queue_size": len(coordinator.map_queue),
             "reduce_queue_size": len(coordinator.reduce_queue),
-            "total_jobs": len(coordinator.jobs),
-            "active_jobs": len(
-                [j for j in coordinator.jobs.values() if j["status"] != "completada"]
-            ),
+            "total_jobs": len(jobs),
+            "active_jobs": len([j for j in jobs if j["status"] != "completada"]),
         }
 
     app.include_router(api_router)
@@ -0,0 +1,27 @@
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Tuple
+
+Combiner = Callable[[Iterable[str]], Iterable[Tuple[str, int]]]
+
+
+def sum_combiner(words: Iterable[str]) -> Iterable[Tuple[str, int]]:
+    return Counter(words).items()
+
+
+def identity_combiner(words: Iterable[str]) -> Iterable[Tuple[str, int]]:
+    return ((word, 1) for word in words)
+
+
+COMBINERS: Dict[str, Combiner] = {
+    "sum": sum_combiner,
+    "none": identity_combiner,
+}
+
+
+def get_combiner(name: str) -> Combiner:
+    if name not in COMBINERS:
+        raise ValueError(f"Combiner desconocido: {name}")
+    return COMBINERS[name]
+
+
+__all__ = ["Combiner", "COMBINERS", "get_combiner", "sum_combiner", "identity_combiner"]
@@ -1,26 +1,321 @@
+import statistics
+import threading
+import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+from .leases import (
+    ENGINE_TIMEOUT_SECONDS,
+    LEASE_SECONDS,
+    SPECULATION_FACTOR,
+    SPECULATION_MIN_SECONDS,
+    LeaseMonitor,
+)
+from .scheduler import ALIVE_SECONDS, DEFAULT_STRATEGY, get_scheduler
+from .sharding import ThroughputTracker
+from .task_queue import TaskQueue
 from .utils import get_logger
 
 logger = get_logger(__name__)
 
 
 class CoordinatorState:
+    # Locking: `lock` guards the engines and jobs registries and every
+    # engine's load accounting; each job dict carries its own "lock" for its
+    # counters and phase transitions. Never take `lock` while holding a job
+    # lock. TaskQueue and the log list have their own internal locks.
+
     def __init__(self):
+        self.lock = threading.RLock()
+        self._log_lock = threading.Lock()
         self.engines: Dict[str, Dict[str, Any]] = {}
         self.jobs: Dict[str, Dict[str, Any]] = {}
-        self.map_queue: List[Tuple[str, int, str]] = []
-        self.reduce_queue: List[Tuple[str, str, List[int]]] = []
-        self.balancing_strategy = "round_robin"
-        self.round_robin_index = 0
+        # map tasks: (job_id, shard_id, offset, length) into the job's input file
+        self.map_queue = TaskQueue()
+        # reduce tasks: (job_id, partition_id, [MapPartition, ...])
+        self.reduce_queue = TaskQueue()
+        # (job_id, task_type, shard_id | partition_id, engine_id) -> task,
+        # start time and lease deadline. A task has several entries while a
+        # speculative backup copy runs alongside the original.
+        self.inflight: Dict[Tuple[str, str, int, str], Dict[str, Any]] = {}
+        # Backup copies waiting for an engine other than the ones running them
+        self.speculative: deque = deque()
+        self.monitor: Optional[LeaseMonitor] = None
         self.logs: List[Dict[str, str]] = []
+        self.map_throughput = ThroughputTracker()
+        # Bumped whenever tasks are queued or engine capacity frees up, so
+        # streaming dispatchers can sleep until there is something to do
+        self._tasks_changed = threading.Condition()
+        self._tasks_version = 0
 
     def add_log(self, message: str):
         timestamp = datetime.now(timezone.utc).isoformat()
-        self.logs.append({"timestamp": timestamp, "message": message})
+        with self._log_lock:
+            self.logs.append({"timestamp": timestamp, "message": message})
+            if len(self.logs) > 200:
+                self.logs = self.logs[-200:]
         logger.info(message)
-        if len(self.logs) > 200:
-            self.logs = self.logs[-200:]
+
+    def register_engine(
+        self, engine_id: str, role: str, capacity: int, shared_storage: bool = False
+    ):
+        with self.lock:
+            self.engines[engine_id] = {
+                "role": role,
+                "capacity": capacity,
+                "current_load": 0,
+                "last_seen": time.time(),
+                "shared_storage": shared_storage,
+                "streaming": False,
+                "lost": False,
+                "avg_task_seconds": None,
+            }
+
+    def heartbeat(self, engine_id: str) -> bool:
+        with self.lock:
+            engine = self.engines.get(engine_id)
+            if engine is None:
+                return False
+            engine["last_seen"] = time.time()
+            engine["lost"] = False
+            deadline = time.monotonic() + LEASE_SECONDS
+            for key, entry in self.inflight.items():
+                if key[3] == engine_id:
+                    entry["deadline"] = deadline
+            return True
+
+    def set_streaming(self, engine_id: str, streaming: bool):
+        with self.lock:
+            engine = self.engines.get(engine_id)
+            if engine is not None:
+                engine["streaming"] = streaming
+
+    def add_job(self, job: Dict[str, Any]):
+        job["lock"] = threading.Lock()
+        with self.lock:
+            self.jobs[job["job_id"]] = job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def jobs_snapshot(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return list(self.jobs.values())
+
+    def engines_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            return {engine_id: dict(e) for engine_id, e in self.engines.items()}
+
+    def take_task(self, engine_id: str):
+        # Pops the next task for the engine and charges it to its load in a
+        # single step, so two threads can't both pass the capacity check.
+        # Each queued job's balancing strategy decides whether this engine
+        # should get its next task or leave it for a better candidate.
+        assigned = None
+        with self.lock:
+            engine = self.engines.get(engine_id)
+            if engine is None:
+                return None, None
+            now = time.time()
+            engine["last_seen"] = now
+            engine["lost"] = False
+            if engine["current_load"] >= engine["capacity"]:
+                return None, None
+            if engine["role"] == "mapper":
+                task_type, queue = "map", self.map_queue
+            elif engine["role"] == "reducer":
+                task_type, queue = "reduce", self.reduce_queue
+            else:
+                return None, None
+
+            task = self._take_speculative(engine_id, task_type)
+            if task is None:
+                candidates = self._candidates(engine["role"], now)
+                candidates[engine_id] = engine
+
+                def accept(job_id):
+                    job = self.jobs.get(job_id)
+                    if job is None:
+                        return True
+                    strategy = job.get("balancing_strategy") or DEFAULT_STRATEGY
+                    return get_scheduler(strategy).accepts(job, engine_id, candidates)
+
+                task = queue.pop(accept)
+            if task is None:
+                return None, None
+            job = self.jobs.get(task[0])
+            if job is not None:
+                strategy = job.get("balancing_strategy") or DEFAULT_STRATEGY
+                get_scheduler(strategy).assigned(job, engine_id)
+            engine["current_load"] += 1
+            started = time.monotonic()
+            backup = bool(self._attempts(task[0], task_type, task[1]))
+            self.inflight[(task[0], task_type, task[1], engine_id)] = {
+                "task": task,
+                "started": started,
+                "deadline": started + LEASE_SECONDS,
+                "speculated": backup,
+            }
+            assigned = task_type, task
+        if queue:
+            # Engines this task was held back for, or that were skipped in
+            # favour of this one, re-evaluate against the new loads
+            self.notify_tasks()
+        return assigned
+
+    def _take_speculative(self, engine_id: str, task_type: str):
+        for _ in range(len(self.speculative)):
+            entry_type, task = self.speculative.popleft()
+            job = self.jobs.get(task[0])
+            if job is None or self.is_task_done(job, entry_type, task[1]):
+                continue
+            running = self._attempts(task[0], entry_type, task[1])
+            if entry_type == task_type and engine_id not in running:
+                return task
+            self.speculative.append((entry_type, task))
+        return None
+
+    def _attempts(self, job_id: str, task_type: str, task_id: int) -> List[str]:
+        return [
+            key[3]
+            for key in self.inflight
+            if key[0] == job_id and key[1] == task_type and key[2] == task_id
+        ]
+
+    @staticmethod
+    def is_task_done(job: Dict[str, Any], task_type: str, task_id: int) -> bool:
+        done = job["done_shards"] if task_type == "map" else job["done_partitions"]
+        return task_id in done
+
+    def _candidates(self, role: str, now: float) -> Dict[str, Dict[str, Any]]:
+        return {
+            engine_id: engine
+            for engine_id, engine in self.engines.items()
+            if engine["role"] == role
+            and engine["current_load"] < engine["capacity"]
+            and not engine["lost"]
+            and (engine["streaming"] or now - engine["last_seen"] <= ALIVE_SECONDS)
+        }
+
+    def finish_task(
+        self, engine_id: str, job_id: str, task_type: str, task_id: int
+    ) -> Optional[float]:
+        # Frees the engine's slot and returns how long the task took, or None
+        # if the engine wasn't running that task
+        with self.lock:
+            entry = self.inflight.pop((job_id, task_type, task_id, engine_id), None)
+            if entry is None:
+                return None
+            elapsed = time.monotonic() - entry["started"]
+            engine = self.engines.get(engine_id)
+            if engine is not None:
+                # defensive: never go below 0
+                engine["current_load"] = max(0, engine["current_load"] - 1)
+                avg = engine["avg_task_seconds"]
+                engine["avg_task_seconds"] = (
+                    elapsed if avg is None else avg + 0.2 * (elapsed - avg)
+                )
+        self.notify_tasks()
+        return elapsed
+
+    def expire_leases(self):
+        # Re-queues tasks whose lease ran out or whose engine went silent,
+        # unless the task already finished or another attempt is still alive
+        requeued = []
+        with self.lock:
+            now = time.time()
+            for engine_id, engine in self.engines.items():
+                if engine["lost"] or now - engine["last_seen"] <= ENGINE_TIMEOUT_SECONDS:
+                    continue
+                engine["lost"] = True
+                self.add_log(f"Engine {engine_id} sin señales: marcado como perdido")
+            mono = time.monotonic()
+            expired = [
+                key
+                for key, entry in self.inflight.items()
+                if entry["deadline"] < mono
+                or self.engines.get(key[3], {"lost": True})["lost"]
+            ]
+            for key in expired:
+                entry = self.inflight.pop(key)
+                job_id, task_type, task_id, engine_id = key
+                engine = self.engines.get(engine_id)
+                if engine is not None:
+                    engine["current_load"] = max(0, engine["current_load"] - 1)
+                job = self.jobs.get(job_id)
+                if job is None or job["status"] == "completada":
+                    continue
+                if self.is_task_done(job, task_type, task_id):
+                    continue
+                if self._attempts(job_id, task_type, task_id):
+                    continue
+                queue = self.map_queue if task_type == "map" else self.reduce_queue
+                queue.push(job_id, entry["task"])
+                requeued.append(key)
+        for job_id, task_type, task_id, engine_id in requeued:
+            self.add_log(
+                f"Lease vencido: tarea {task_type} {task_id} del trabajo {job_id} "
+                f"(engine {engine_id}) vuelve a la cola"
+            )
+        if expired:
+            self.notify_tasks()
+
+    def speculate(self):
+        # Backup copies for the stragglers of a phase that has no queued work
+        # left; whichever attempt reports first wins, the other is ignored
+        launched = []
+        with self.lock:
+            mono = time.monotonic()
+            for key, entry in self.inflight.items():
+                job_id, task_type, task_id, _ = key
+                if entry["speculated"]:
+                    continue
+                job = self.jobs.get(job_id)
+                if job is None or self.is_task_done(job, task_type, task_id):
+                    continue
+                queue = self.map_queue if task_type == "map" else self.reduce_queue
+                durations = job["task_seconds"][task_type]
+                if queue.job_size(job_id) or not durations:
+                    continue
+                threshold = max(
+                    SPECULATION_MIN_SECONDS,
+                    SPECULATION_FACTOR * statistics.median(durations),
+                )
+                if mono - entry["started"] < threshold:
+                    continue
+                for other in self.inflight:
+                    if other[:3] == key[:3]:
+                        self.inflight[other]["speculated"] = True
+                self.speculative.append((task_type, entry["task"]))
+                launched.append(key)
+        for job_id, task_type, task_id, engine_id in launched:
+            self.add_log(
+                f"Ejecución especulativa: tarea {task_type} {task_id} del trabajo "
+                f"{job_id} (lenta en {engine_id})"
+            )
+        if launched:
+            self.notify_tasks()
+
+    def start_monitor(self):
+        if self.monitor is None:
+            self.monitor = LeaseMonitor(self)
+            self.monitor.start()
+
+    def notify_tasks(self):
+        with self._tasks_changed:
+            self._tasks_version += 1
+            self._tasks_changed.notify_all()
+
+    def tasks_version(self) -> int:
+        return self._tasks_version
+
+    def wait_for_tasks(self, version: int, timeout: float) -> int:
+        with self._tasks_changed:
+            self._tasks_changed.wait_for(
+                lambda: self._tasks_version != version, timeout
+            )
+            return self._tasks_version
 
 
 # Singleton coordinator instance (usado por grpc_service, api, etc.)
@@ -1,6 +1,7 @@
 import grpc
 from concurrent import futures
 import jobs_pb2_grpc
+from .coordinator import coordinator
 from .grpc_service import JobServiceServicer
 from .utils import get_logger
 
@@ -13,5 +14,7 @@ def start_grpc_server(port: int = 50051, max_workers: int = 10):
     address = f"[::]:{port}"
     server.add_insecure_port(address)
     server.start()
+    # Re-queues tasks of lost engines and backs up stragglers
+    coordinator.start_monitor()
     logger.info(f"Servidor gRPC iniciado en {address}")
     return server
@@ -1,8 +1,10 @@
 from datetime import datetime, timezone
+import threading
+import grpc
 import jobs_pb2
 import jobs_pb2_grpc
-import time
 from .coordinator import coordinator
+from .ingest import discard, read_range
 from .utils import get_logger
 
 logger = get_logger(__name__)
@@ -13,109 +15,201 @@ class JobServiceServicer(jobs_pb2_grpc.JobServiceServicer):
         engine_id = request.engine_id
         role = request.role
         capacity = request.capacity
-        coordinator.engines[engine_id] = {
-            "role": role,
-            "capacity": capacity,
-            "current_load": 0,
-            "last_seen": time.time(),
-        }
+        coordinator.register_engine(engine_id, role, capacity, request.shared_storage)
         coordinator.add_log(
             f"Engine {engine_id} registrado como {role} con capacidad {capacity}"
+            + (" (almacenamiento compartido)" if request.shared_storage else "")
         )
         return jobs_pb2.RegisterEngineReply(
             success=True, message=f"Engine {engine_id} registrado correctamente"
         )
 
+    def Heartbeat(self, request, context):
+        # Keeps the engine's leases alive; an unknown engine (e.g. after a
+        # coordinator restart) is told to register again
+        known = coordinator.heartbeat(request.engine_id)
+        return jobs_pb2.HeartbeatReply(known=known)
+
     def FetchJob(self, request, context):
-        engine_id = request.engine_id
+        reply = self._next_task(request.engine_id)
+        return reply or jobs_pb2.FetchJobReply(task_type="none")
+
+    def StreamTasks(self, request_iterator, context):
+        # Push model: the engine opens the stream with its initial credits
+        # (normally its capacity), gets a task pushed for every credit as soon
+        # as one is queued, and returns a credit with each result it streams
+        # back. Holds a server thread for as long as the engine is connected.
+        hello = next(request_iterator, None)
+        if hello is None:
+            return
+        engine_id = hello.engine_id
         if engine_id not in coordinator.engines:
-            return jobs_pb2.FetchJobReply(task_type="none")
-        engine = coordinator.engines[engine_id]
-        engine["last_seen"] = time.time()
-        if engine["current_load"] >= engine["capacity"]:
-            return jobs_pb2.FetchJobReply(task_type="none")
-
-        if engine["role"] == "mapper" and coordinator.map_queue:
-            job_id, shard_id, text = coordinator.map_queue.pop(0)
-            engine["current_load"] += 1
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Engine no registrado")
+        session = {"credits": hello.credits, "open": True}
+        session_lock = threading.Lock()
+
+        def consume():
+            try:
+                for message in request_iterator:
+                    if message.HasField("result"):
+                        self.ReportResult(message.result, context)
+                    if message.credits:
+                        with session_lock:
+                            session["credits"] += message.credits
+                    coordinator.notify_tasks()
+            except grpc.RpcError:
+                pass
+            finally:
+                session["open"] = False
+                coordinator.notify_tasks()
+
+        threading.Thread(target=consume, daemon=True).start()
+        coordinator.set_streaming(engine_id, True)
+        coordinator.add_log(f"Engine {engine_id} conectado por stream")
+        while session["open"] and context.is_active():
+            version = coordinator.tasks_version()
+            if session["credits"] > 0:
+                reply = self._next_task(engine_id)
+                if reply is not None:
+                    with session_lock:
+                        session["credits"] -= 1
+                    yield reply
+                    continue
+            coordinator.wait_for_tasks(version, timeout=1.0)
+        coordinator.set_streaming(engine_id, False)
+        coordinator.add_log(f"Engine {engine_id} desconectado del stream")
+
+    def _next_task(self, engine_id):
+        task_type, task = coordinator.take_task(engine_id)
+
+        if task_type == "map":
+            job_id, shard_id, offset, length = task
+            job = coordinator.jobs[job_id]
+            map_task = jobs_pb2.MapTask(
+                job_id=job_id, shard_id=shard_id, num_partitions=job["num_partitions"]
+            )
+            if coordinator.engines[engine_id].get("shared_storage"):
+                # Co-located engine: send a reference, it maps the file itself
+                map_task.input_path = job["input_path"]
+                map_task.offset = offset
+                map_task.length = length
+            else:
+                map_task.text_content = read_range(job["input_path"], offset, length)
             coordinator.add_log(
                 f"Tarea de mapeo asignada (Trabajo={job_id}, shard={shard_id}) a {engine_id}"
             )
-            return jobs_pb2.FetchJobReply(
-                task_type="map",
-                map_task=jobs_pb2.MapTask(
-                    job_id=job_id, shard_id=shard_id, text_content=text
-                ),
-            )
+            return jobs_pb2.FetchJobReply(task_type="map", map_task=map_task)
 
-        if engine["role"] == "reducer" and coordinator.reduce_queue:
-            job_id, word, counts = coordinator.reduce_queue.pop(0)
-            engine["current_load"] += 1
+        if task_type == "reduce":
+            job_id, partition_id, inputs = task
             coordinator.add_log(
-                f"Tarea de reducción asignada (Trabajo={job_id}, palabra={word}) a {engine_id}"
+                f"Tarea de reducción asignada (Trabajo={job_id}, partición={partition_id}) a {engine_id}"
             )
             return jobs_pb2.FetchJobReply(
                 task_type="reduce",
                 reduce_task=jobs_pb2.ReduceTask(
-                    job_id=job_id, word=word, counts=counts
+                    job_id=job_id, partition_id=partition_id, inputs=inputs
                 ),
             )
-        return jobs_pb2.FetchJobReply(task_type="none")
+        return None
 
     def ReportResult(self, request, context):
         engine_id = request.engine_id
         job_id = request.job_id
         task_type = request.task_type
+        task_id = request.shard_id if task_type == "map" else request.partition_id
 
-        if engine_id in coordinator.engines:
-            # defensive: never go below 0
-            coordinator.engines[engine_id]["current_load"] = max(
-                0, coordinator.engines[engine_id]["current_load"] - 1
-            )
+        elapsed = coordinator.finish_task(engine_id, job_id, task_type, task_id)
 
-        if job_id not in coordinator.jobs:
+        job = coordinator.get_job(job_id)
+        if job is None:
             return jobs_pb2.ReportResultReply(
                 success=False, message="Trabajo no encontrado"
             )
+        if task_type == "map" and elapsed is not None:
+            coordinator.map_throughput.observe(job["shards"][task_id][1], elapsed)
 
-        job = coordinator.jobs[job_id]
+        with job["lock"]:
+            if elapsed is not None:
+                job["task_seconds"][task_type].append(elapsed)
+            applied = self._apply_result(job, engine_id, request)
+        if not applied:
+            return jobs_pb2.ReportResultReply(
+                success=True, message="Resultado duplicado ignorado"
+            )
+        return jobs_pb2.ReportResultReply(success=True, message="Resultado recibido")
 
+    def _apply_result(self, job, engine_id, request):
+        # Returns False for a result whose task another attempt (a re-queued
+        # or speculative copy) already delivered
+        job_id = job["job_id"]
+        task_type = request.task_type
+        task_id = request.shard_id if task_type == "map" else request.partition_id
+        if coordinator.is_task_done(job, task_type, task_id) or task_type not in (
+            "map",
+            "reduce",
+        ):
+            coordinator.add_log(
+                f"Resultado duplicado ignorado de {engine_id} (Trabajo={job_id}, tarea {task_type} {task_id})"
+            )
+            return False
         if task_type == "map":
             shard_id = request.shard_id
+            job["done_shards"].add(shard_id)
             job["completed_shards"] += 1
-            for output in request.map_outputs:
-                job["map_results"][output.word].append(output.count)
+            # Mappers already split their output per reducer bucket, so the
+            # shuffle only files whole partitions, never individual words
+            for partition in request.map_partitions:
+                if partition.outputs:
+                    job["map_partitions"][partition.partition_id].append(partition)
             coordinator.add_log(
                 f"Resultado de mapeo recibido de {engine_id} (Trabajo={job_id}, shard={shard_id})"
             )
             if job["completed_shards"] == job["num_shards"]:
-                job["status"] = "reduciendo"
-                for word, counts in job["map_results"].items():
-                    coordinator.reduce_queue.append((job_id, word, counts))
-                job["num_reduce_tasks"] = len(job["map_results"])
-                coordinator.add_log(
-                    f"Job {job_id} pasa a REDUCCIÓN con {job['num_reduce_tasks']} tareas"
-                )
+                self._start_reduce(job)
 
         elif task_type == "reduce":
-            word = request.word
-            total = request.total_count
-            job["reduce_results"][word] = total
+            partition_id = request.partition_id
+            job["done_partitions"].add(partition_id)
+            for output in request.reduce_outputs:
+                job["reduce_results"][output.word] = output.count
             job["completed_reduce_tasks"] += 1
             coordinator.add_log(
-                f"Resultado de reducción recibido de {engine_id} (Trabajo={job_id}, palabra={word}, conteo={total})"
+                f"Resultado de reducción recibido de {engine_id} (Trabajo={job_id}, partición={partition_id}, palabras={len(request.reduce_outputs)})"
             )
             if job["completed_reduce_tasks"] == job.get("num_reduce_tasks", 0):
-                job["status"] = "completada"
-                job["completed_at"] = datetime.now(timezone.utc).isoformat()
-                sorted_words = sorted(
-                    job["reduce_results"].items(), key=lambda x: x[1], reverse=True
-                )
-                job["top_words"] = [
-                    {"word": w, "count": c} for w, c in sorted_words[:10]
-                ]
-                coordinator.add_log(
-                    f"Trabajo {job_id} COMPLETADO con {len(sorted_words)} palabras únicas"
-                )
+                self._complete_job(job)
+        return True
 
-        return jobs_pb2.ReportResultReply(success=True, message="Resultado recibido")
+    def _start_reduce(self, job):
+        job_id = job["job_id"]
+        tasks = [
+            (job_id, partition_id, inputs)
+            for partition_id, inputs in enumerate(job["map_partitions"])
+            if inputs
+        ]
+        job["status"] = "reduciendo"
+        job["num_reduce_tasks"] = len(tasks)
+        if not tasks:
+            self._complete_job(job)
+            return
+        coordinator.reduce_queue.extend(job_id, tasks)
+        coordinator.notify_tasks()
+        coordinator.add_log(
+            f"Job {job_id} pasa a REDUCCIÓN con {job['num_reduce_tasks']} tareas"
+        )
+
+    def _complete_job(self, job):
+        coordinator.map_queue.remove_job(job["job_id"])
+        coordinator.reduce_queue.remove_job(job["job_id"])
+        discard(job["input_path"])
+        sorted_words = sorted(
+            job["reduce_results"].items(), key=lambda x: x[1], reverse=True
+        )
+        job["top_words"] = [{"word": w, "count": c} for w, c in sorted_words[:10]]
+        job["completed_at"] = datetime.now(timezone.utc).isoformat()
+        # Last: readers don't take the job lock and key off the status
+        job["status"] = "completada"
+        coordinator.add_log(
+            f"Trabajo {job['job_id']} COMPLETADO con {len(sorted_words)} palabras únicas"
+        )
@@ -0,0 +1,118 @@
+import codecs
+import mmap
+import os
+import re
+import tempfile
+import uuid
+from pathlib import Path
+from typing import List, NamedTuple, Tuple
+from .utils import env, get_logger
+
+logger = get_logger(__name__)
+
+SPOOL_DIR = Path(env("SPOOL_DIR", Path(tempfile.gettempdir()) / "mapreduce-spool"))
+CHUNK_SIZE = 1024 * 1024
+# ASCII whitespace never appears inside a multi-byte UTF-8 sequence and never
+# inside a \w+ token, so cutting right after it keeps both intact
+_WHITESPACE = re.compile(rb"\s")
+
+
+class SpooledInput(NamedTuple):
+    path: str
+    size: int  # bytes
+    text_length: int  # characters
+
+
+def _new_spool_path() -> Path:
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    return SPOOL_DIR / f"{uuid.uuid4()}.txt"
+
+
+def spool_text(text: str) -> SpooledInput:
+    path = _new_spool_path()
+    data = text.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+    return SpooledInput(str(path), len(data), len(text))
+
+
+async def spool_upload(upload) -> SpooledInput:
+    # Copies the upload to disk in fixed-size chunks, validating UTF-8 and
+    # counting characters on the way, so the body is never held in memory
+    path = _new_spool_path()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    size = 0
+    text_length = 0
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                text_length += len(decoder.decode(chunk))
+                size += len(chunk)
+                f.write(chunk)
+            text_length += len(decoder.decode(b"", final=True))
+    except Exception:
+        discard(str(path))
+        raise
+    return SpooledInput(str(path), size, text_length)
+
+
+def compute_shard_ranges(path: str, size: int, num_shards: int) -> List[Tuple[int, int]]:
+    # (offset, length) of each shard: evenly spaced cut points, each pushed
+    # forward to just past the next whitespace byte. Empty input still gets
+    # one (empty) shard so the job flows through map and reduce as usual.
+    if size == 0:
+        return [(0, 0)]
+    num_shards = max(1, num_shards)
+    ranges = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        for i in range(1, num_shards):
+            target = max(start, i * size // num_shards)
+            match = _WHITESPACE.search(mm, target)
+            if match is None:
+                break
+            end = match.end()
+            if end > start:
+                ranges.append((start, end - start))
+                start = end
+        if start < size:
+            ranges.append((start, size - start))
+    return ranges
+
+
+def read_range(path: str, offset: int, length: int) -> str:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length).decode("utf-8")
+
+
+def map_range(path: str, offset: int, length: int) -> str:
+    # Decodes straight out of the page cache: no intermediate bytes copy
+    if length == 0:
+        return ""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return str(view[offset : offset + length], "utf-8")
+
+
+def discard(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("No se pudo borrar %s: %s", path, e)
+
+
+__all__ = [
+    "SpooledInput",
+    "spool_text",
+    "spool_upload",
+    "compute_shard_ranges",
+    "read_range",
+    "map_range",
+    "discard",
+]
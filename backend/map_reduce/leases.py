@@ -0,0 +1,43 @@
+import threading
+from .utils import env, get_logger
+
+logger = get_logger(__name__)
+
+# A dispatched task is leased to its engine; heartbeats renew the lease and
+# an expired lease puts the task back in the queue
+LEASE_SECONDS = float(env("TASK_LEASE_SECONDS", 30))
+# Engines silent for this long are marked lost and their tasks re-queued
+ENGINE_TIMEOUT_SECONDS = float(env("ENGINE_TIMEOUT_SECONDS", 15))
+# Once a job phase has nothing left in the queue, tasks running longer than
+# SPECULATION_FACTOR x the phase's median task time get a backup copy
+SPECULATION_FACTOR = float(env("SPECULATION_FACTOR", 2.0))
+SPECULATION_MIN_SECONDS = float(env("SPECULATION_MIN_SECONDS", 1.0))
+MONITOR_INTERVAL_SECONDS = float(env("LEASE_MONITOR_INTERVAL", 1.0))
+
+
+class LeaseMonitor(threading.Thread):
+    def __init__(self, state, interval: float = MONITOR_INTERVAL_SECONDS):
+        super().__init__(name="lease-monitor", daemon=True)
+        self.state = state
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.state.expire_leases()
+                self.state.speculate()
+            except Exception as e:
+                logger.exception("Error en el monitor de leases: %s", e)
+
+    def stop(self):
+        self._stopped.set()
+
+
+__all__ = [
+    "LEASE_SECONDS",
+    "ENGINE_TIMEOUT_SECONDS",
+    "SPECULATION_FACTOR",
+    "SPECULATION_MIN_SECONDS",
+    "LeaseMonitor",
+]
@@ -1,10 +1,25 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 
 
-class JobCreate(BaseModel):
-    text: str
+class JobOptions(BaseModel):
     balancing_strategy: Optional[str] = "round_robin"
+    num_reduce_partitions: Optional[int] = Field(default=None, ge=1)
+    priority: Optional[int] = 0  # higher is served first
+
+
+class JobCreate(JobOptions):
+    text: str
+
+
+class ShardPlan(BaseModel):
+    input_bytes: int
+    num_mappers: int
+    mapper_slots: int
+    throughput_bytes_per_sec: Optional[float] = None
+    target_shard_bytes: int
+    num_shards: int
+    reason: str
 
 
 class JobResponse(BaseModel):
@@ -12,6 +27,8 @@ class JobResponse(BaseModel):
     status: str
     text_length: int
     num_shards: int
+    num_reduce_partitions: Optional[int] = None
+    shard_plan: Optional[ShardPlan] = None
     top_words: Optional[List[Dict[str, Any]]] = None
     created_at: str
     completed_at: Optional[str] = None
@@ -23,6 +40,7 @@ class EngineInfo(BaseModel):
     role: str
     capacity: int
     current_load: int
+    avg_task_seconds: Optional[float] = None
     last_seen: str
     status: str
 
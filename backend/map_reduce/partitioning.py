@@ -0,0 +1,23 @@
+import zlib
+from typing import Iterable, List, Tuple
+from .utils import env
+
+DEFAULT_NUM_PARTITIONS = int(env("REDUCE_PARTITIONS", 4))
+
+
+def partition_for(word: str, num_partitions: int) -> int:
+    # crc32 instead of hash(): str hashes are salted per process and mappers,
+    # reducers and the coordinator must agree on the bucket of every word
+    return zlib.crc32(word.encode("utf-8")) % num_partitions
+
+
+def split_by_partition(
+    pairs: Iterable[Tuple[str, int]], num_partitions: int
+) -> List[List[Tuple[str, int]]]:
+    buckets: List[List[Tuple[str, int]]] = [[] for _ in range(num_partitions)]
+    for word, count in pairs:
+        buckets[partition_for(word, num_partitions)].append((word, count))
+    return buckets
+
+
+__all__ = ["DEFAULT_NUM_PARTITIONS", "partition_for", "split_by_partition"]
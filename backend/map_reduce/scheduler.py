@@ -0,0 +1,102 @@
+import statistics
+from typing import Any, Dict
+from .utils import env
+
+# Polling engines count as available only if they asked for work recently;
+# streaming engines are available for as long as their stream is open
+ALIVE_SECONDS = float(env("SCHEDULER_ALIVE_SECONDS", 1.0))
+# throughput_weighted accepts engines within this fraction of the best one
+THROUGHPUT_TOLERANCE = float(env("SCHEDULER_THROUGHPUT_TOLERANCE", 0.1))
+
+Engines = Dict[str, Dict[str, Any]]
+
+
+class Scheduler:
+    # Pull-model scheduling: when an engine asks for work, the strategy of
+    # each queued job decides whether that engine is the one that should get
+    # its next task, given the other engines (`candidates`) that could take
+    # it right now. The requesting engine is always among the candidates.
+
+    name = ""
+
+    def accepts(self, job: Dict[str, Any], engine_id: str, candidates: Engines) -> bool:
+        return True
+
+    def assigned(self, job: Dict[str, Any], engine_id: str):
+        pass
+
+
+class RoundRobinScheduler(Scheduler):
+    name = "round_robin"
+
+    def accepts(self, job, engine_id, candidates):
+        # Next engine (by id) after the last one this job was given to
+        order = sorted(candidates)
+        last = job.get("rr_last_engine")
+        following = [e for e in order if last is None or e > last]
+        return (following or order)[0] == engine_id
+
+    def assigned(self, job, engine_id):
+        job["rr_last_engine"] = engine_id
+
+
+class LeastLoadedScheduler(Scheduler):
+    name = "least_loaded"
+
+    @staticmethod
+    def _utilization(engine):
+        return engine["current_load"] / max(1, engine["capacity"])
+
+    def accepts(self, job, engine_id, candidates):
+        mine = self._utilization(candidates[engine_id])
+        return mine <= min(self._utilization(e) for e in candidates.values())
+
+
+class ThroughputWeightedScheduler(Scheduler):
+    name = "throughput_weighted"
+
+    def accepts(self, job, engine_id, candidates):
+        # Expected time to finish one more task: queue depth times observed
+        # latency. Engines without history are assumed to be typical.
+        known = [
+            e["avg_task_seconds"]
+            for e in candidates.values()
+            if e.get("avg_task_seconds")
+        ]
+        default = statistics.median(known) if known else 1.0
+
+        def expected(engine):
+            return (engine["current_load"] + 1) * (
+                engine.get("avg_task_seconds") or default
+            )
+
+        best = min(expected(e) for e in candidates.values())
+        return expected(candidates[engine_id]) <= best * (1 + THROUGHPUT_TOLERANCE)
+
+
+SCHEDULERS: Dict[str, Scheduler] = {
+    s.name: s
+    for s in (
+        RoundRobinScheduler(),
+        LeastLoadedScheduler(),
+        ThroughputWeightedScheduler(),
+    )
+}
+DEFAULT_STRATEGY = "round_robin"
+
+
+def get_scheduler(name: str) -> Scheduler:
+    if name not in SCHEDULERS:
+        raise ValueError(f"Estrategia de balanceo desconocida: {name}")
+    return SCHEDULERS[name]
+
+
+__all__ = [
+    "Scheduler",
+    "RoundRobinScheduler",
+    "LeastLoadedScheduler",
+    "ThroughputWeightedScheduler",
+    "SCHEDULERS",
+    "DEFAULT_STRATEGY",
+    "get_scheduler",
+]
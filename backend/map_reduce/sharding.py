@@ -0,0 +1,87 @@
+import math
+import threading
+from typing import Any, Dict, Iterable, Optional
+from .models import ShardPlan
+from .utils import env
+
+TARGET_SHARD_BYTES = int(env("TARGET_SHARD_BYTES", 4 * 1024 * 1024))
+MIN_SHARD_BYTES = int(env("MIN_SHARD_BYTES", 64 * 1024))
+MAX_SHARD_BYTES = int(env("MAX_SHARD_BYTES", 64 * 1024 * 1024))
+# With throughput history, size shards to take about this long on one slot
+TARGET_SHARD_SECONDS = float(env("TARGET_SHARD_SECONDS", 2.0))
+
+
+class ThroughputTracker:
+    # Exponential moving average of map throughput (bytes/s per task slot)
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._estimate: Optional[float] = None
+        self.samples = 0
+
+    def observe(self, num_bytes: int, seconds: float):
+        if seconds <= 0 or num_bytes <= 0:
+            return
+        rate = num_bytes / seconds
+        with self._lock:
+            if self._estimate is None:
+                self._estimate = rate
+            else:
+                self._estimate += self.alpha * (rate - self._estimate)
+            self.samples += 1
+
+    @property
+    def estimate(self) -> Optional[float]:
+        return self._estimate
+
+
+def plan_shards(
+    input_bytes: int,
+    engines: Iterable[Dict[str, Any]],
+    throughput: Optional[float] = None,
+) -> ShardPlan:
+    mappers = [e for e in engines if e["role"] == "mapper"]
+    slots = sum(max(1, e["capacity"]) for e in mappers)
+
+    target = TARGET_SHARD_BYTES
+    if throughput:
+        target = int(throughput * TARGET_SHARD_SECONDS)
+    target = min(MAX_SHARD_BYTES, max(MIN_SHARD_BYTES, target))
+
+    # Enough shards to respect the target size; if that leaves mapper slots
+    # idle, split further (never below MIN_SHARD_BYTES) and round up to whole
+    # waves so the last wave isn't a lone straggler.
+    by_size = math.ceil(input_bytes / target) if input_bytes else 0
+    max_shards = max(1, input_bytes // MIN_SHARD_BYTES)
+    num_shards = max(1, by_size)
+    if slots:
+        waves = max(1, math.ceil(num_shards / slots))
+        num_shards = max(num_shards, min(max_shards, waves * slots))
+    num_shards = min(num_shards, max_shards)
+
+    if not input_bytes:
+        reason = "entrada vacía"
+    elif num_shards == 1 and max_shards == 1:
+        reason = f"entrada menor que el shard mínimo ({MIN_SHARD_BYTES} bytes)"
+    elif slots and num_shards % slots == 0:
+        reason = f"{num_shards // slots} ronda(s) sobre {slots} slots de mapeo"
+    elif slots and num_shards > by_size:
+        reason = f"limitado por el shard mínimo ({MIN_SHARD_BYTES} bytes)"
+    else:
+        reason = f"tamaño objetivo de {target} bytes por shard"
+    if not slots and input_bytes:
+        reason += " (sin mappers registrados)"
+
+    return ShardPlan(
+        input_bytes=input_bytes,
+        num_mappers=len(mappers),
+        mapper_slots=slots,
+        throughput_bytes_per_sec=throughput,
+        target_shard_bytes=target,
+        num_shards=num_shards,
+        reason=reason,
+    )
+
+
+__all__ = ["ThroughputTracker", "plan_shards"]
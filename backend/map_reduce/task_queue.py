@@ -0,0 +1,106 @@
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional
+
+
+class TaskQueue:
+    # FIFO inside each job, round-robin between the jobs of the highest
+    # pending priority, so a job with 100k tasks cannot starve a small one.
+    # push and pop are O(1) (plus the handful of distinct priority levels).
+    # Every public method is atomic, the queue is shared by the gRPC threads.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, Deque[Any]] = {}
+        self._priorities: Dict[str, int] = {}
+        # priority -> ring of job_ids that currently have pending tasks
+        self._rings: Dict[int, Deque[str]] = {}
+        self._size = 0
+
+    def set_priority(self, job_id: str, priority: int):
+        with self._lock:
+            old = self._priorities.get(job_id, 0)
+            self._priorities[job_id] = priority
+            if job_id in self._tasks and old != priority:
+                self._unlink(job_id, old)
+                self._rings.setdefault(priority, deque()).append(job_id)
+
+    def push(self, job_id: str, task: Any):
+        self.extend(job_id, (task,))
+
+    def extend(self, job_id: str, tasks: Iterable[Any]):
+        with self._lock:
+            pending = self._tasks.get(job_id)
+            if pending is None:
+                pending = deque(tasks)
+                if not pending:
+                    return
+                self._tasks[job_id] = pending
+                priority = self._priorities.get(job_id, 0)
+                self._rings.setdefault(priority, deque()).append(job_id)
+                self._size += len(pending)
+            else:
+                before = len(pending)
+                pending.extend(tasks)
+                self._size += len(pending) - before
+
+    def pop(self, accept: Optional[Callable[[str], bool]] = None) -> Optional[Any]:
+        # `accept(job_id)` lets the caller skip jobs that shouldn't hand a task
+        # to this consumer; skipped jobs keep their place in the rotation
+        with self._lock:
+            if not self._size:
+                return None
+            if accept is None:
+                priority = max(self._rings)
+                return self._take(priority, self._rings[priority].popleft())
+            for priority in sorted(self._rings, reverse=True):
+                ring = self._rings[priority]
+                for index, job_id in enumerate(ring):
+                    if accept(job_id):
+                        del ring[index]
+                        return self._take(priority, job_id)
+            return None
+
+    def _take(self, priority: int, job_id: str) -> Any:
+        # job_id has already been unlinked from its ring
+        ring = self._rings[priority]
+        pending = self._tasks[job_id]
+        task = pending.popleft()
+        self._size -= 1
+        if pending:
+            ring.append(job_id)
+        else:
+            del self._tasks[job_id]
+        if not ring:
+            del self._rings[priority]
+        return task
+
+    def remove_job(self, job_id: str) -> int:
+        with self._lock:
+            priority = self._priorities.pop(job_id, 0)
+            pending = self._tasks.pop(job_id, None)
+            if pending is None:
+                return 0
+            self._unlink(job_id, priority)
+            self._size -= len(pending)
+            return len(pending)
+
+    def job_size(self, job_id: str) -> int:
+        with self._lock:
+            return len(self._tasks.get(job_id, ()))
+
+    def _unlink(self, job_id: str, priority: int):
+        ring = self._rings.get(priority)
+        if ring is not None and job_id in ring:
+            ring.remove(job_id)
+            if not ring:
+                del self._rings[priority]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+
+__all__ = ["TaskQueue"]
@@ -0,0 +1,54 @@
+# Added path adjustment for module imports
+from pathlib import Path
+import sys
+path = Path(__file__).parent
+sys.path.append(str(path.parent))
+
+import argparse
+import time
+from map_reduce.task_queue import TaskQueue
+
+
+def bench_list(num_tasks):
+    queue = [("job", i, None) for i in range(num_tasks)]
+    start = time.perf_counter()
+    while queue:
+        queue.pop(0)
+    return time.perf_counter() - start
+
+
+def bench_task_queue(num_tasks, num_jobs):
+    queue = TaskQueue()
+    per_job = num_tasks // num_jobs
+    for j in range(num_jobs):
+        job_id = f"job-{j}"
+        queue.set_priority(job_id, j % 2)
+        queue.extend(job_id, ((job_id, i, None) for i in range(per_job)))
+    start = time.perf_counter()
+    while queue:
+        queue.pop()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,200000")
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument(
+        "--skip-list", action="store_true", help="omite la línea base list.pop(0)"
+    )
+    args = parser.parse_args()
+    print(f"{'tareas':>10} {'list.pop(0)':>14} {'TaskQueue':>14} {'ns/pop':>10}")
+    for size in map(int, args.sizes.split(",")):
+        list_time = None if args.skip_list else bench_list(size)
+        queue_time = bench_task_queue(size, args.jobs)
+        list_col = "-" if list_time is None else f"{list_time:.4f}s"
+        queue_col = f"{queue_time:.4f}s"
+        print(
+            f"{size:>10} {list_col:>14} {queue_col:>14} "
+            f"{queue_time / size * 1e9:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
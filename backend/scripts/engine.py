@@ -8,23 +8,107 @@ import grpc
 import jobs_pb2
 import jobs_pb2_grpc
 import argparse
+import multiprocessing
+import queue
+import threading
 import time
 import re
-from collections import Counter
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from map_reduce.combiners import COMBINERS, get_combiner
+from map_reduce.ingest import map_range
+from map_reduce.partitioning import split_by_partition
 from map_reduce.utils import get_logger
 logger = get_logger(__name__)
 
 
+def map_shard(
+    text: str,
+    num_partitions: int,
+    combiner: str,
+    input_path: str = "",
+    offset: int = 0,
+    length: int = 0,
+) -> bytes:
+    # Runs inside the map process pool: returns the partitions serialized in
+    # a ReportResultRequest so only one bytes object crosses the process
+    # boundary instead of a pickled list of tuples. Shard references are
+    # resolved here too, so the text never crosses it either.
+    if input_path:
+        text = map_range(input_path, offset, length)
+    words = re.findall(r"\b\w+\b", text.lower())
+    buckets = split_by_partition(get_combiner(combiner)(words), num_partitions or 1)
+    report = jobs_pb2.ReportResultRequest(
+        map_partitions=[
+            jobs_pb2.MapPartition(
+                partition_id=partition_id,
+                outputs=[jobs_pb2.MapOutput(word=w, count=c) for w, c in pairs],
+            )
+            for partition_id, pairs in enumerate(buckets)
+        ]
+    )
+    return report.SerializeToString()
+
+
 class EngineWorker:
     def __init__(
-        self, engine_id: str, role: str, capacity: int, coordinator_address: str
+        self,
+        engine_id: str,
+        role: str,
+        capacity: int,
+        coordinator_address: str,
+        combiner: str = "sum",
+        transport: str = "stream",
+        map_executor: str = "process",
+        shared_storage: bool = False,
+        heartbeat_interval: float = 5.0,
     ):
         self.engine_id = engine_id
         self.role = role
         self.capacity = capacity
         self.coordinator_address = coordinator_address
+        get_combiner(combiner)  # fail fast on unknown names
+        self.combiner = combiner
+        self.transport = transport
+        self.map_executor = map_executor
+        self.shared_storage = shared_storage
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_thread = None
         self.channel = None
         self.stub = None
+        # Up to `capacity` tasks run at once: the thread pool runs tasks and
+        # their RPCs, map tokenization goes to a process pool to escape the GIL
+        self.executor = None
+        self.map_pool = None
+        self.slots = threading.Semaphore(capacity)
+
+    def start_pools(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.capacity, thread_name_prefix=self.engine_id
+            )
+        if self.map_pool is None and self.role == "mapper":
+            if self.map_executor == "process":
+                # spawn: forking a process that already has gRPC threads is unsafe
+                self.map_pool = ProcessPoolExecutor(
+                    max_workers=self.capacity,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                # Pay the interpreter start-up now rather than on the first job
+                warmup = [
+                    self.map_pool.submit(map_shard, "", 1, self.combiner)
+                    for _ in range(self.capacity)
+                ]
+                for future in warmup:
+                    future.result()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.map_pool is not None:
+            self.map_pool.shutdown(wait=False, cancel_futures=True)
+        if self.channel is not None:
+            self.channel.close()
 
     def connect(self):
         try:
@@ -39,7 +123,10 @@ class EngineWorker:
     def register(self):
         try:
             req = jobs_pb2.RegisterEngineRequest(
-                engine_id=self.engine_id, role=self.role, capacity=self.capacity
+                engine_id=self.engine_id,
+                role=self.role,
+                capacity=self.capacity,
+                shared_storage=self.shared_storage,
             )
             res = self.stub.RegisterEngine(req)
             if res.success:
@@ -52,61 +139,160 @@ class EngineWorker:
             logger.exception("Error registro: %s", e)
             return False
 
+    def start_heartbeat(self):
+        if self.heartbeat_thread is None and self.heartbeat_interval > 0:
+            self.heartbeat_thread = threading.Thread(
+                target=self.heartbeat_loop, daemon=True
+            )
+            self.heartbeat_thread.start()
+
+    def heartbeat_loop(self):
+        # Keeps the leases of long tasks alive independently of task traffic
+        while True:
+            time.sleep(self.heartbeat_interval)
+            stub = self.stub
+            if stub is None:
+                continue
+            try:
+                res = stub.Heartbeat(
+                    jobs_pb2.HeartbeatRequest(engine_id=self.engine_id)
+                )
+                if not res.known:
+                    logger.warning("El coordinador no conoce este engine: registrando")
+                    self.register()
+            except grpc.RpcError as e:
+                logger.warning("Heartbeat falló: %s", e.code())
+
     def process_map_task(self, task):
         logger.info("Procesando map: %s shard=%s", task.job_id, task.shard_id)
-        words = re.findall(r"\b\w+\b", task.text_content.lower())
-        wc = Counter(words)
-        outputs = []
-        for w, c in wc.items():
-            outputs.append(jobs_pb2.MapOutput(word=w, count=c))
-        logger.info("Map completo: %d palabras únicas", len(wc))
-        return outputs
+        args = (
+            task.text_content,
+            task.num_partitions,
+            self.combiner,
+            task.input_path,
+            task.offset,
+            task.length,
+        )
+        if self.map_pool is not None:
+            data = self.map_pool.submit(map_shard, *args).result()
+        else:
+            data = map_shard(*args)
+        partitions = jobs_pb2.ReportResultRequest.FromString(data).map_partitions
+        logger.info(
+            "Map completo: %d pares emitidos", sum(len(p.outputs) for p in partitions)
+        )
+        return partitions
 
     def process_reduce_task(self, task):
-        logger.info("Procesando reduce: %s word=%s", task.job_id, task.word)
-        total = sum(task.counts)
-        logger.info("Reduce result: %s => %d", task.word, total)
-        return total
+        logger.info(
+            "Procesando reduce: %s partition=%s", task.job_id, task.partition_id
+        )
+        totals = defaultdict(int)
+        for partition in task.inputs:
+            for output in partition.outputs:
+                totals[output.word] += output.count
+        outputs = [jobs_pb2.MapOutput(word=w, count=c) for w, c in totals.items()]
+        logger.info("Reduce completo: %d palabras", len(outputs))
+        return outputs
+
+    def process_task(self, res):
+        if res.task_type == "map":
+            task = res.map_task
+            partitions = self.process_map_task(task)
+            return jobs_pb2.ReportResultRequest(
+                engine_id=self.engine_id,
+                job_id=task.job_id,
+                task_type="map",
+                shard_id=task.shard_id,
+                map_partitions=partitions,
+            )
+        if res.task_type == "reduce":
+            task = res.reduce_task
+            outputs = self.process_reduce_task(task)
+            return jobs_pb2.ReportResultRequest(
+                engine_id=self.engine_id,
+                job_id=task.job_id,
+                task_type="reduce",
+                partition_id=task.partition_id,
+                reduce_outputs=outputs,
+            )
+        return None
 
     def fetch_and_process(self):
-        try:
-            req = jobs_pb2.FetchJobRequest(engine_id=self.engine_id)
-            res = self.stub.FetchJob(req)
-            if res.task_type == "none":
-                return False
-            if res.task_type == "map":
-                task = res.map_task
-                outputs = self.process_map_task(task)
-                report = jobs_pb2.ReportResultRequest(
-                    engine_id=self.engine_id,
-                    job_id=task.job_id,
-                    task_type="map",
-                    shard_id=task.shard_id,
-                    map_outputs=outputs,
-                )
-                self.stub.ReportResult(report)
+        # Fills every free slot with FetchJob; tasks run on the thread pool and
+        # give their slot back once their result has been reported.
+        had_work = False
+        while True:
+            if not self.slots.acquire(blocking=False):
+                # Every slot busy: come back soon to refill the one that frees
                 return True
-            elif res.task_type == "reduce":
-                task = res.reduce_task
-                total = self.process_reduce_task(task)
-                report = jobs_pb2.ReportResultRequest(
-                    engine_id=self.engine_id,
-                    job_id=task.job_id,
-                    task_type="reduce",
-                    word=task.word,
-                    total_count=total,
-                )
+            try:
+                req = jobs_pb2.FetchJobRequest(engine_id=self.engine_id)
+                res = self.stub.FetchJob(req)
+            except grpc.RpcError as e:
+                self.slots.release()
+                logger.error("gRPC error: %s", e)
+                return had_work
+            if res.task_type == "none":
+                self.slots.release()
+                return had_work
+            self.executor.submit(self._run_polled_task, res)
+            had_work = True
+        return had_work
+
+    def _run_polled_task(self, res):
+        try:
+            report = self.process_task(res)
+            if report is not None:
                 self.stub.ReportResult(report)
-                return True
         except grpc.RpcError as e:
             logger.error("gRPC error: %s", e)
-            return False
         except Exception as e:
             logger.exception("Error processing: %s", e)
-            return False
+        finally:
+            self.slots.release()
+
+    def stream_tasks(self):
+        # Opens StreamTasks with `capacity` credits and hands one credit back
+        # with every result; returns when the stream breaks.
+        outbox = queue.Queue()
+        outbox.put(
+            jobs_pb2.TaskStreamRequest(engine_id=self.engine_id, credits=self.capacity)
+        )
+
+        def requests():
+            while True:
+                message = outbox.get()
+                if message is None:
+                    return
+                yield message
+
+        def run_task(res):
+            try:
+                report = self.process_task(res)
+            except Exception as e:
+                logger.exception("Error processing: %s", e)
+                report = None
+            outbox.put(
+                jobs_pb2.TaskStreamRequest(
+                    engine_id=self.engine_id, credits=1, result=report
+                )
+            )
+
+        try:
+            # The coordinator never pushes more than our credits, so at most
+            # `capacity` tasks are running or queued on the executor
+            for res in self.stub.StreamTasks(requests()):
+                self.executor.submit(run_task, res)
+        except grpc.RpcError as e:
+            logger.error("gRPC error: %s", e)
+        finally:
+            outbox.put(None)
 
     def run(self):
         logger.info("Iniciando engine %s as %s", self.engine_id, self.role)
+        self.start_pools()
+        self.start_heartbeat()
         while True:
             if not self.channel:
                 if not self.connect():
@@ -116,6 +302,13 @@ class EngineWorker:
                     time.sleep(5)
                     self.channel = None
                     continue
+            if self.transport == "stream":
+                self.stream_tasks()
+                # Stream dropped: reconnect and register again
+                time.sleep(1)
+                self.channel.close()
+                self.channel = None
+                continue
             had_work = self.fetch_and_process()
             if not had_work:
                 # Idle: check queue every 500ms
@@ -131,12 +324,40 @@ def main():
     parser.add_argument("--role", required=True, choices=["mapper", "reducer"])
     parser.add_argument("--capacity", type=int, default=5)
     parser.add_argument("--coordinator", default="localhost:50051")
+    parser.add_argument("--combiner", default="sum", choices=sorted(COMBINERS))
+    parser.add_argument("--transport", default="stream", choices=["stream", "poll"])
+    parser.add_argument(
+        "--map-executor", default="process", choices=["process", "thread"]
+    )
+    parser.add_argument(
+        "--shared-storage",
+        action="store_true",
+        help="lee los shards directamente del spool del coordinador (misma máquina)",
+    )
+    parser.add_argument(
+        "--heartbeat-interval",
+        type=float,
+        default=5.0,
+        help="segundos entre heartbeats (0 los desactiva)",
+    )
     args = parser.parse_args()
-    worker = EngineWorker(args.engine_id, args.role, args.capacity, args.coordinator)
+    worker = EngineWorker(
+        args.engine_id,
+        args.role,
+        args.capacity,
+        args.coordinator,
+        args.combiner,
+        args.transport,
+        args.map_executor,
+        args.shared_storage,
+        args.heartbeat_interval,
+    )
     try:
         worker.run()
     except KeyboardInterrupt:
         logger.info("Engine detenido")
+    finally:
+        worker.close()
 
 
 if __name__ == "__main__":
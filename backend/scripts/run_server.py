@@ -7,14 +7,18 @@ sys.path.append(str(path.parent))
 import uvicorn
 from map_reduce.api import create_app
 from map_reduce.grpc_server import start_grpc_server
-from map_reduce.utils import get_logger
+from map_reduce.utils import get_logger, env
 
 logger = get_logger(__name__)
 
 
 def main():
-    # Start gRPC server in background thread
-    grpc_server = start_grpc_server(port=50051, max_workers=10)
+    # Start gRPC server in background thread. Each engine connected through
+    # StreamTasks holds one worker thread, so size the pool above the number
+    # of engines
+    grpc_server = start_grpc_server(
+        port=50051, max_workers=int(env("GRPC_MAX_WORKERS", 32))
+    )
 
     # Start uvicorn (blocking)
     app = create_app()
@@ -0,0 +1,170 @@
+# Added path adjustment for module imports
+from pathlib import Path
+import sys
+path = Path(__file__).parent
+sys.path.append(str(path.parent))
+
+import argparse
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+import jobs_pb2
+from map_reduce.coordinator import coordinator
+from map_reduce.grpc_service import JobServiceServicer
+from map_reduce.partitioning import split_by_partition
+
+
+def make_job(num_shards, num_partitions):
+    job_id = str(uuid.uuid4())
+    coordinator.add_job(
+        {
+            "job_id": job_id,
+            "input_path": "",
+            "input_bytes": 0,
+            "text_length": 0,
+            "status": "map",
+            "num_shards": num_shards,
+            "shards": [(0, 0)] * num_shards,
+            "shard_plan": None,
+            "balancing_strategy": "least_loaded",
+            "completed_shards": 0,
+            "done_shards": set(),
+            "num_partitions": num_partitions,
+            "map_partitions": [[] for _ in range(num_partitions)],
+            "reduce_results": {},
+            "num_reduce_tasks": 0,
+            "completed_reduce_tasks": 0,
+            "done_partitions": set(),
+            "task_seconds": {"map": [], "reduce": []},
+            "top_words": None,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "completed_at": None,
+        }
+    )
+    return job_id
+
+
+def map_report(engine_id, job_id, shard_id, vocabulary, num_partitions):
+    buckets = split_by_partition(((w, 1) for w in vocabulary), num_partitions)
+    return jobs_pb2.ReportResultRequest(
+        engine_id=engine_id,
+        job_id=job_id,
+        task_type="map",
+        shard_id=shard_id,
+        map_partitions=[
+            jobs_pb2.MapPartition(
+                partition_id=pid,
+                outputs=[jobs_pb2.MapOutput(word=w, count=c) for w, c in pairs],
+            )
+            for pid, pairs in enumerate(buckets)
+        ],
+    )
+
+
+def run(num_threads, num_shards, num_partitions, vocabulary_size):
+    servicer = JobServiceServicer()
+    vocabulary = [f"w{i}" for i in range(vocabulary_size)]
+    for t in range(num_threads):
+        servicer.RegisterEngine(
+            jobs_pb2.RegisterEngineRequest(
+                engine_id=f"stress-m{t}", role="mapper", capacity=num_shards
+            ),
+            None,
+        )
+        servicer.RegisterEngine(
+            jobs_pb2.RegisterEngineRequest(
+                engine_id=f"stress-r{t}", role="reducer", capacity=2
+            ),
+            None,
+        )
+    job_id = make_job(num_shards, num_partitions)
+    reports = [
+        map_report(f"stress-m{s % num_threads}", job_id, s, vocabulary, num_partitions)
+        for s in range(num_shards)
+    ]
+    barrier = threading.Barrier(num_threads)
+
+    def hammer_map(t):
+        barrier.wait()
+        for report in reports[t::num_threads]:
+            servicer.ReportResult(report, None)
+
+    def hammer_reduce(t):
+        engine_id = f"stress-r{t}"
+        barrier.wait()
+        while True:
+            reply = servicer.FetchJob(
+                jobs_pb2.FetchJobRequest(engine_id=engine_id), None
+            )
+            if reply.task_type == "none":
+                if coordinator.reduce_queue.job_size(job_id) == 0:
+                    return
+                continue
+            task = reply.reduce_task
+            totals = {}
+            for partition in task.inputs:
+                for output in partition.outputs:
+                    totals[output.word] = totals.get(output.word, 0) + output.count
+            servicer.ReportResult(
+                jobs_pb2.ReportResultRequest(
+                    engine_id=engine_id,
+                    job_id=job_id,
+                    task_type="reduce",
+                    partition_id=task.partition_id,
+                    reduce_outputs=[
+                        jobs_pb2.MapOutput(word=w, count=c) for w, c in totals.items()
+                    ],
+                ),
+                None,
+            )
+
+    start = time.perf_counter()
+    for target in (hammer_map, hammer_reduce):
+        threads = [
+            threading.Thread(target=target, args=(t,)) for t in range(num_threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+
+    job = coordinator.jobs[job_id]
+    errors = []
+    if job["completed_shards"] != num_shards:
+        errors.append(f"completed_shards={job['completed_shards']} != {num_shards}")
+    if job["status"] != "completada":
+        errors.append(f"status={job['status']}")
+    if len(job["reduce_results"]) != vocabulary_size:
+        errors.append(f"palabras={len(job['reduce_results'])} != {vocabulary_size}")
+    wrong = [w for w, c in job["reduce_results"].items() if c != num_shards]
+    if wrong:
+        errors.append(f"{len(wrong)} conteos incorrectos")
+    loads = {e: v["current_load"] for e, v in coordinator.engines.items()}
+    if any(loads.values()):
+        errors.append(f"current_load residual: {loads}")
+    return elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--shards", type=int, default=2000)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--vocabulary", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    failed = 0
+    for i in range(args.rounds):
+        elapsed, errors = run(args.threads, args.shards, args.partitions, args.vocabulary)
+        status = "OK" if not errors else "FALLO: " + "; ".join(errors)
+        print(f"ronda {i + 1}: {elapsed:.2f}s {status}")
+        failed += bool(errors)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
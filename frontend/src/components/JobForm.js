@@ -111,6 +111,7 @@ function JobForm({ onJobCreated }) {
             >
               <option value="round_robin">Round Robin</option>
               <option value="least_loaded">Least Loaded</option>
+              <option value="throughput_weighted">Throughput Weighted</option>
             </select>
           </div>
 